@@ -0,0 +1,101 @@
+"""
+Dynamic micro-batching for the ML service
+Kept free of model dependencies so it can be imported (and tested) on its own
+"""
+
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-text requests into batched model calls
+    Requests enqueue a text and await a Future; a background thread
+    drains up to max_batch items (or whatever arrived within max_delay_ms)
+    and runs them through the model in one forward pass
+    """
+
+    def __init__(self, name, predict, max_batch, max_delay_ms):
+        self.name = name
+        self.predict = predict
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self._queue = None
+        self._pid = None
+
+    def _start(self):
+        self._queue = queue.Queue()
+        thread = threading.Thread(target=self._run, name=f'{self.name}-batcher', daemon=True)
+        thread.start()
+        self._pid = os.getpid()
+
+    def submit(self, text):
+        """Queue a text (or text pair) for inference and return a Future resolving to its result"""
+        # Threads don't survive fork(), so each (preloaded) worker process starts
+        # its own on first use. Only the event loop thread submits - no race here
+        if self._pid != os.getpid():
+            self._start()
+
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    async def infer(self, text):
+        """Await the result without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(text))
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        # The thread is the only consumer of the queue - if it dies every later
+        # request hangs, so nothing is allowed to escape this loop
+        while True:
+            batch = []
+            try:
+                batch = self._collect()
+                self._process(batch)
+            except Exception as e:
+                logger.error(f"Error in {self.name} batcher: {str(e)}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _process(self, batch):
+        # Drop requests whose caller went away (client disconnect cancels the
+        # awaiting task, which cancels the Future). Once marked running, a
+        # Future can no longer be cancelled, so resolving it below is safe
+        batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        texts = [text for text, _ in batch]
+        try:
+            results = self.predict(texts)
+        except Exception as e:
+            logger.error(f"Error in batched inference: {str(e)}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
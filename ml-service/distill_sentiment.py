@@ -0,0 +1,144 @@
+"""
+Sentiment Student Distillation
+Trains a 4-layer BERT student (google/bert_uncased_L-4_H-256_A-4) on SST-2 against the
+soft labels of DistilBERT-SST2 and saves it where app.py picks it up as the default
+sentiment model
+
+Run with: python distill_sentiment.py [--output-dir DIR] [--epochs N]
+"""
+
+import argparse
+import logging
+import os
+import numpy as np
+import torch
+import torch.nn.functional as F
+from datasets import load_dataset
+from transformers import (
+    AutoModelForSequenceClassification,
+    AutoTokenizer,
+    DataCollatorWithPadding,
+    Trainer,
+    TrainingArguments
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TEACHER_MODEL_ID = "distilbert-base-uncased-finetuned-sst-2-english"
+STUDENT_BASE_MODEL_ID = "google/bert_uncased_L-4_H-256_A-4"
+DEFAULT_OUTPUT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    'models',
+    'sentiment-student'
+)
+
+# Social posts are short - SST-2 sentences fit comfortably too
+MAX_LENGTH = 128
+
+
+class DistillationTrainer(Trainer):
+    """
+    Trainer whose loss blends the hard SST-2 labels with the teacher's
+    temperature-softened predictions (Hinton et al. knowledge distillation)
+    """
+
+    def __init__(self, *args, teacher, temperature, alpha, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.teacher = teacher.to(self.args.device).eval()
+        self.temperature = temperature
+        self.alpha = alpha
+
+    def compute_loss(self, model, inputs, return_outputs=False, **kwargs):
+        outputs = model(**inputs)
+
+        # Both models use the bert-base-uncased vocabulary, so the student's input
+        # ids feed the teacher as-is (DistilBERT just takes no token_type_ids)
+        with torch.no_grad():
+            teacher_logits = self.teacher(
+                input_ids=inputs['input_ids'],
+                attention_mask=inputs['attention_mask']
+            ).logits
+
+        temperature = self.temperature
+        soft_loss = F.kl_div(
+            F.log_softmax(outputs.logits / temperature, dim=-1),
+            F.softmax(teacher_logits / temperature, dim=-1),
+            reduction='batchmean'
+        ) * temperature ** 2
+        loss = self.alpha * soft_loss + (1 - self.alpha) * outputs.loss
+
+        return (loss, outputs) if return_outputs else loss
+
+
+def compute_metrics(eval_pred):
+    logits, labels = eval_pred
+    return {'accuracy': float((np.argmax(logits, axis=-1) == labels).mean())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Distill the sentiment student model')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument('--epochs', type=float, default=4)
+    parser.add_argument('--learning-rate', type=float, default=1e-4)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--temperature', type=float, default=2.0)
+    parser.add_argument('--alpha', type=float, default=0.5,
+                        help='Weight of the distillation loss vs the hard-label loss')
+    args = parser.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(STUDENT_BASE_MODEL_ID)
+    teacher = AutoModelForSequenceClassification.from_pretrained(TEACHER_MODEL_ID)
+    # Same label mapping as the teacher, so responses keep POSITIVE / NEGATIVE labels
+    student = AutoModelForSequenceClassification.from_pretrained(
+        STUDENT_BASE_MODEL_ID,
+        num_labels=teacher.config.num_labels,
+        id2label=teacher.config.id2label,
+        label2id=teacher.config.label2id
+    )
+
+    dataset = load_dataset('glue', 'sst2')
+    dataset = dataset.map(
+        lambda batch: tokenizer(batch['sentence'], truncation=True, max_length=MAX_LENGTH),
+        batched=True,
+        remove_columns=['sentence', 'idx']
+    )
+
+    training_args = TrainingArguments(
+        output_dir=os.path.join(args.output_dir, 'checkpoints'),
+        num_train_epochs=args.epochs,
+        learning_rate=args.learning_rate,
+        per_device_train_batch_size=args.batch_size,
+        per_device_eval_batch_size=args.batch_size * 2,
+        warmup_ratio=0.06,
+        eval_strategy='epoch',
+        save_strategy='no',
+        fp16=torch.cuda.is_available(),
+        report_to=[]
+    )
+
+    trainer = DistillationTrainer(
+        model=student,
+        args=training_args,
+        train_dataset=dataset['train'],
+        eval_dataset=dataset['validation'],
+        data_collator=DataCollatorWithPadding(tokenizer),
+        compute_metrics=compute_metrics,
+        teacher=teacher,
+        temperature=args.temperature,
+        alpha=args.alpha
+    )
+
+    logger.info(f"Distilling {TEACHER_MODEL_ID} into {STUDENT_BASE_MODEL_ID}...")
+    trainer.train()
+
+    metrics = trainer.evaluate()
+    logger.info(f"✓ Student SST-2 validation accuracy: {metrics['eval_accuracy']:.4f}")
+
+    trainer.save_model(args.output_dir)
+    tokenizer.save_pretrained(args.output_dir)
+    logger.info(f"✓ Student saved to {args.output_dir}")
+
+
+if __name__ == '__main__':
+    main()
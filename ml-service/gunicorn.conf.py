@@ -0,0 +1,47 @@
+"""
+Gunicorn configuration for the ML microservice
+Run with: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import multiprocessing
+import os
+
+# Ask torch to detect GPUs through NVML so the master never initializes CUDA
+os.environ.setdefault('PYTORCH_NVML_BASED_CUDA_CHECK', '1')
+
+import torch
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+worker_class = 'uvicorn.workers.UvicornWorker'
+
+if torch.cuda.is_available():
+    # CUDA cannot be re-initialized in a child forked after the parent touched it,
+    # so a GPU host runs one worker that loads the models itself
+    workers = 1
+    preload_app = False
+
+    # The worker loads, compiles and warms up the models (or builds TensorRT engines
+    # on a cold cache) before its first heartbeat - don't kill it while it does
+    timeout = int(os.environ.get('GUNICORN_TIMEOUT', 1800))
+else:
+    # Load the models once in the master; workers inherit them copy-on-write
+    # so model memory stays flat as the worker count grows
+    preload_app = True
+    timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+
+    # The shared ONNX Runtime sessions are single-threaded - a thread pool would not
+    # survive fork() - so parallelism comes from the processes: one worker per core.
+    # Per-worker cost is the interpreter and activations, not another copy of the weights
+    workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+    os.environ.setdefault('ORT_INTRA_OP_THREADS', '1')
+
+    # The IPEX backend sizes each worker's torch thread pool after fork (app.init_worker)
+    os.environ['ML_PRELOADED'] = '1'
+    worker_intra_op_threads = max(1, multiprocessing.cpu_count() // workers)
+
+
+def post_fork(server, worker):
+    if preload_app:
+        # Already imported by the master - this only looks it up in sys.modules
+        import app
+        app.init_worker(worker_intra_op_threads)
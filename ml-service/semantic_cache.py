@@ -0,0 +1,95 @@
+"""
+Semantic result cache for the ML service
+Kept free of model dependencies so it can be imported (and tested) on its own
+"""
+
+import re
+
+import numpy as np
+
+
+def _normalize_text(text):
+    """Lower-case and drop punctuation/extra whitespace, so trivially different posts share a key"""
+    return ' '.join(re.findall(r'\w+', text.lower()))
+
+
+class SemanticCache:
+    """
+    Batch prediction wrapper that reuses results for near-duplicate texts
+    ("Loved this movie!!!" vs "Loved this movie!"). A text hits only if a cached
+    text has the same normalized form AND their embeddings' cosine similarity is
+    above the threshold. The embedding check catches what normalization throws
+    away ("great :)" vs "great :(") - similarity alone is not enough, since a
+    flipped negation ("not good" vs "good") can still embed very close.
+    Only cache misses reach the model, but every text pays for an embedding -
+    so this only helps in front of a model that costs more than the encoder.
+    Called from the model's batcher thread only
+    """
+
+    def __init__(self, predict, encoder, threshold, maxsize):
+        self.predict = predict
+        self.encoder = encoder
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # _vectors and _results are parallel; _keys maps normalized text to an
+        # absolute entry number, offset by how many entries have been evicted
+        self._vectors = []
+        self._results = []
+        self._keys = {}
+        self._evicted = 0
+
+    def __call__(self, texts):
+        keys = [_normalize_text(text) for text in texts]
+        results = [None] * len(texts)
+
+        vectors = self.encoder.encode(
+            list(texts),
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        ).astype(np.float32)
+
+        for i, key in enumerate(keys):
+            entry = self._keys.get(key)
+            if entry is None:
+                continue
+            row = entry - self._evicted
+            if float(vectors[i] @ self._vectors[row]) > self.threshold:
+                results[i] = self._results[row]
+
+        misses = [i for i, result in enumerate(results) if result is None]
+
+        if misses:
+            predictions = self.predict([texts[i] for i in misses])
+            for i, prediction in zip(misses, predictions):
+                results[i] = prediction
+            self._add(vectors[misses], [keys[i] for i in misses], predictions)
+
+        self.hits += len(texts) - len(misses)
+        self.misses += len(misses)
+        return results
+
+    def _add(self, vectors, keys, predictions):
+        for key, vector, prediction in zip(keys, vectors, predictions):
+            self._keys[key] = self._evicted + len(self._results)
+            self._vectors.append(vector)
+            self._results.append(prediction)
+
+        # Evict the oldest 10% in one go, so the key map is rebuilt rarely
+        overflow = len(self._results) - self.maxsize
+        if overflow > 0:
+            evict = overflow + self.maxsize // 10
+            del self._vectors[:evict]
+            del self._results[:evict]
+            self._evicted += evict
+            self._keys = {key: entry for key, entry in self._keys.items() if entry >= self._evicted}
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._results),
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
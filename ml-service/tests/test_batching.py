@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+import pytest
+
+from batching import MicroBatcher
+
+
+def _upper(texts):
+    return [text.upper() for text in texts]
+
+
+def test_batches_concurrent_requests():
+    calls = []
+
+    def predict(texts):
+        calls.append(list(texts))
+        return _upper(texts)
+
+    batcher = MicroBatcher('test', predict, max_batch=8, max_delay_ms=50)
+    futures = [batcher.submit(text) for text in ('a', 'b', 'c')]
+
+    assert [future.result(timeout=2) for future in futures] == ['A', 'B', 'C']
+    assert calls == [['a', 'b', 'c']]
+
+
+def test_cancelled_request_does_not_kill_batcher():
+    async def scenario():
+        batcher = MicroBatcher('test', _upper, max_batch=8, max_delay_ms=50)
+
+        # Cancelled while the batcher is still collecting, i.e. before its result is set
+        abandoned = asyncio.ensure_future(batcher.infer('gone'))
+        await asyncio.sleep(0)
+        abandoned.cancel()
+
+        assert await asyncio.wait_for(batcher.infer('next'), timeout=2) == 'NEXT'
+        assert abandoned.cancelled()
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_future_is_skipped():
+    release = threading.Event()
+    calls = []
+
+    def predict(texts):
+        release.wait(timeout=2)
+        calls.append(list(texts))
+        return _upper(texts)
+
+    batcher = MicroBatcher('test', predict, max_batch=8, max_delay_ms=50)
+    blocker = batcher.submit('first')
+    cancelled = batcher.submit('second')
+    kept = batcher.submit('third')
+    # 'first' may or may not have been picked up yet - only 'second' is cancelled
+    assert cancelled.cancel()
+    release.set()
+
+    assert blocker.result(timeout=2) == 'FIRST'
+    assert kept.result(timeout=2) == 'THIRD'
+    assert 'second' not in sum(calls, [])
+
+
+def test_prediction_error_is_propagated_and_batcher_survives():
+    failures = iter([RuntimeError('boom')])
+
+    def predict(texts):
+        error = next(failures, None)
+        if error:
+            raise error
+        return _upper(texts)
+
+    batcher = MicroBatcher('test', predict, max_batch=8, max_delay_ms=1)
+
+    with pytest.raises(RuntimeError, match='boom'):
+        batcher.submit('a').result(timeout=2)
+    assert batcher.submit('b').result(timeout=2) == 'B'
+
+
+def test_wrong_result_count_does_not_kill_batcher():
+    results = iter([None, ['X']])
+
+    def predict(texts):
+        # First call returns garbage that makes resolving the batch itself fail
+        return next(results)
+
+    batcher = MicroBatcher('test', predict, max_batch=8, max_delay_ms=1)
+
+    with pytest.raises(TypeError):
+        batcher.submit('a').result(timeout=2)
+    assert batcher.submit('b').result(timeout=2) == 'X'
@@ -0,0 +1,80 @@
+import numpy as np
+
+from semantic_cache import SemanticCache
+
+
+class FakeEncoder:
+    """Embeds texts from a fixed table of unit vectors"""
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+
+    def encode(self, texts, normalize_embeddings, convert_to_numpy):
+        vectors = np.array([self.embeddings[text] for text in texts], dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class FakeModel:
+    def __init__(self, labels):
+        self.labels = labels
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [self.labels[text] for text in texts]
+
+
+def _cache(embeddings, labels, maxsize=100):
+    model = FakeModel(labels)
+    cache = SemanticCache(model, FakeEncoder(embeddings), threshold=0.95, maxsize=maxsize)
+    return cache, model
+
+
+def test_near_duplicate_hits():
+    cache, model = _cache(
+        {'Loved this movie!!!': [1, 0, 0], 'loved this movie.': [0.99, 0.05, 0]},
+        {'Loved this movie!!!': 'POSITIVE'}
+    )
+
+    assert cache(['Loved this movie!!!']) == ['POSITIVE']
+    assert cache(['loved this movie.']) == ['POSITIVE']
+    assert model.calls == [['Loved this movie!!!']]
+    assert cache.stats()['hits'] == 1
+
+
+def test_similar_text_with_flipped_sentiment_misses():
+    # Negation barely moves the embedding, but the normalized text differs
+    cache, model = _cache(
+        {'this is good': [1, 0, 0], 'this is not good': [0.999, 0.04, 0]},
+        {'this is good': 'POSITIVE', 'this is not good': 'NEGATIVE'}
+    )
+
+    assert cache(['this is good']) == ['POSITIVE']
+    assert cache(['this is not good']) == ['NEGATIVE']
+    assert model.calls == [['this is good'], ['this is not good']]
+
+
+def test_same_normalized_text_with_dissimilar_embedding_misses():
+    # Normalization drops the emoticons, the embedding still tells them apart
+    cache, model = _cache(
+        {'great :)': [1, 0, 0], 'great :(': [0.5, 0.85, 0]},
+        {'great :)': 'POSITIVE', 'great :(': 'NEGATIVE'}
+    )
+
+    assert cache(['great :)']) == ['POSITIVE']
+    assert cache(['great :(']) == ['NEGATIVE']
+    assert cache(['great :(']) == ['NEGATIVE']
+    assert model.calls == [['great :)'], ['great :(']]
+
+
+def test_eviction_keeps_rows_aligned():
+    texts = [f'post {n}' for n in range(12)]
+    embeddings = {text: np.eye(3)[n % 3] + n for n, text in enumerate(texts)}
+    cache, model = _cache(embeddings, {text: text.upper() for text in texts}, maxsize=10)
+
+    for text in texts:
+        cache([text])
+
+    assert cache.stats()['size'] <= 10
+    assert cache([texts[-1]]) == [texts[-1].upper()]
+    assert len(model.calls) == len(texts)